@@ -0,0 +1,276 @@
+import argparse
+import csv
+import hashlib
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+
+from replay import ARQUIVO_PADRAO, chave_registro, map_bounded, parse_record
+from server import DouradoGame
+
+# ------------------------------------------
+# Estatísticas do Histórico de Partidas
+# ------------------------------------------
+CHUNK_PADRAO = 1000     # Registros por bloco enviado a cada processo
+VERSAO_CACHE = 3        # Incrementar quando o formato dos agregados mudar
+FORMATO_DATA = "%Y-%m-%d %H:%M:%S"
+
+
+def novo_agregado():
+    """Retorna um agregado vazio. Todos os campos são contadores, para que blocos possam ser somados."""
+    return {
+        "partidas": 0,
+        "duplicados": 0,         # Registros repetidos de uma mesma partida, ignorados
+        "modos": {},
+        "duplas": {"Dupla 1": 0, "Dupla 2": 0},
+        "assentos": {},          # {assento: {"partidas": n, "vitorias": n}}
+        "naipes": {},            # {naipe: {"partidas": n, "Dupla 1": n, "Dupla 2": n}}
+        "duracao": {"partidas": 0, "segundos": 0},
+        "trunfos_decisivos": {}, # {carta: rodadas vencidas}
+        "jogadores": {},         # {nome: {"partidas": n, "vitorias": n, "rodadas": n}}
+    }
+
+
+def _incrementa(contador, chave, valor=1):
+    contador[chave] = contador.get(chave, 0) + valor
+
+
+def merge_aggregates(destino, origem):
+    """Soma recursivamente os contadores de 'origem' em 'destino'."""
+    for chave, valor in origem.items():
+        if isinstance(valor, dict):
+            merge_aggregates(destino.setdefault(chave, {}), valor)
+        else:
+            _incrementa(destino, chave, valor)
+    return destino
+
+
+def aggregate_rows(rows):
+    """Calcula o agregado de um bloco de linhas do CSV (executado nos processos trabalhadores)."""
+    agregado = novo_agregado()
+    game = DouradoGame()
+    for row in rows:
+        try:
+            registro = parse_record(row)
+        except (ValueError, SyntaxError):
+            continue
+        vencedor = row.get("Vencedor", "")
+        agregado["partidas"] += 1
+        _incrementa(agregado["modos"], registro["modo"])
+        _incrementa(agregado["duplas"], vencedor)
+
+        for assento, nome in enumerate(registro["jogadores"]):
+            venceu = vencedor == f"Dupla {assento % 2 + 1}"
+            stats_assento = agregado["assentos"].setdefault(str(assento + 1), {"partidas": 0, "vitorias": 0})
+            stats_assento["partidas"] += 1
+            stats_assento["vitorias"] += venceu
+            stats_jogador = agregado["jogadores"].setdefault(nome, {"partidas": 0, "vitorias": 0, "rodadas": 0})
+            stats_jogador["partidas"] += 1
+            stats_jogador["vitorias"] += venceu
+
+        if registro["trump_suit"]:
+            stats_naipe = agregado["naipes"].setdefault(registro["trump_suit"], {"partidas": 0})
+            stats_naipe["partidas"] += 1
+            _incrementa(stats_naipe, vencedor)
+
+        inicio, fim = row.get("Início da Partida"), row.get("Término da Partida")
+        if inicio and fim:
+            try:
+                segundos = (datetime.strptime(fim, FORMATO_DATA) - datetime.strptime(inicio, FORMATO_DATA)).total_seconds()
+            except ValueError:
+                segundos = None
+            if segundos is not None:
+                agregado["duracao"]["partidas"] += 1
+                agregado["duracao"]["segundos"] += segundos
+
+        game.trump_suit = registro["trump_suit"]
+        for nome, carta in registro["vencedores"]:
+            if nome in agregado["jogadores"]:
+                agregado["jogadores"][nome]["rodadas"] += 1
+            # Cartas especiais e do naipe da virada têm prioridade >= 6 em card_value
+            if game.card_value(carta, None)[0] >= 6:
+                _incrementa(agregado["trunfos_decisivos"], game.format_card(carta))
+    return agregado
+
+
+def iter_chunks(filename, offset, chunk_size):
+    """
+    Lê o CSV a partir do byte 'offset' e gera (linhas, offset_final) em blocos.
+    O offset_final aponta para o fim do último registro completo do bloco. Um registro só é
+    considerado completo quando sua última linha termina em quebra de linha e não há campo entre
+    aspas em aberto; um final incompleto (partida sendo gravada) fica para a próxima execução.
+    """
+    with open(filename, "rb") as file:
+        header = next(csv.reader([file.readline().decode("utf-8")]))
+        posicao = max(offset, file.tell())
+        file.seek(posicao)
+
+        chunk = []
+        registro, tamanho, aspas = [], 0, 0
+        for raw in file:
+            if not raw.endswith(b"\n"):
+                break  # Última linha ainda sendo escrita
+            registro.append(raw.decode("utf-8"))
+            tamanho += len(raw)
+            aspas += raw.count(b'"')
+            if aspas % 2:
+                continue  # Campo entre aspas continua na próxima linha
+            values = next(csv.reader(registro), None)
+            posicao += tamanho
+            registro, tamanho, aspas = [], 0, 0
+            if not values:
+                continue
+            chunk.append(dict(zip(header, values)))
+            if len(chunk) == chunk_size:
+                yield chunk, posicao
+                chunk = []
+        if chunk:
+            yield chunk, posicao
+
+
+def caminho_cache(filename):
+    return filename + ".stats.json"
+
+
+def _assinatura(filename, offset):
+    """Hash dos bytes imediatamente anteriores ao offset, usado para detectar se o arquivo foi reescrito."""
+    with open(filename, "rb") as file:
+        inicio = max(0, offset - 256)
+        file.seek(inicio)
+        return hashlib.sha1(file.read(offset - inicio)).hexdigest()
+
+
+def load_cache(filename):
+    """Carrega o cache de agregados se ele ainda corresponde ao início do arquivo; caso contrário, retorna None."""
+    try:
+        with open(caminho_cache(filename), encoding="utf-8") as file:
+            cache = json.load(file)
+    except (OSError, ValueError):
+        return None
+    if cache.get("versao") != VERSAO_CACHE or cache.get("offset", 0) > os.path.getsize(filename):
+        return None
+    if cache.get("assinatura") != _assinatura(filename, cache["offset"]):
+        return None
+    return cache
+
+
+def save_cache(filename, offset, agregado, vistos):
+    cache = {
+        "versao": VERSAO_CACHE,
+        "offset": offset,
+        "assinatura": _assinatura(filename, offset),
+        "agregado": agregado,
+        "vistos": sorted(vistos),  # Chaves das partidas já agregadas, para descartar duplicatas futuras
+    }
+    with open(caminho_cache(filename), "w", encoding="utf-8") as file:
+        json.dump(cache, file, ensure_ascii=False)
+
+
+def compute_stats(filename=ARQUIVO_PADRAO, workers=None, chunk_size=CHUNK_PADRAO, usar_cache=True):
+    """
+    Agrega as estatísticas do arquivo. Com cache, apenas os registros após o último offset processado
+    são lidos; os blocos novos são agregados em paralelo e somados ao agregado armazenado.
+    Registros repetidos de uma partida (mesma chave_registro) são descartados antes da agregação.
+    Retorna (agregado, registros_novos).
+    """
+    cache = load_cache(filename) if usar_cache else None
+    offset = cache["offset"] if cache else 0
+    agregado = cache["agregado"] if cache else novo_agregado()
+    vistos = set(cache["vistos"]) if cache else set()
+
+    offsets = []
+
+    def blocos():
+        for rows, fim in iter_chunks(filename, offset, chunk_size):
+            offsets.append(fim)
+            unicos = []
+            for row in rows:
+                chave = chave_registro(row)
+                if chave in vistos:
+                    agregado["duplicados"] += 1
+                else:
+                    vistos.add(chave)
+                    unicos.append(row)
+            yield unicos
+
+    antes = agregado["partidas"]
+    if workers == 1:
+        for rows in blocos():
+            merge_aggregates(agregado, aggregate_rows(rows))
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            for parcial in map_bounded(executor, aggregate_rows, blocos(),
+                                       2 * (workers or os.cpu_count() or 1)):
+                merge_aggregates(agregado, parcial)
+
+    if usar_cache:
+        save_cache(filename, offsets[-1] if offsets else offset, agregado, vistos)
+    return agregado, agregado["partidas"] - antes
+
+
+def _taxa(vitorias, partidas):
+    return f"{100 * vitorias / partidas:.1f}%" if partidas else "-"
+
+
+def format_report(agregado, top=10):
+    """Monta o relatório em texto a partir de um agregado."""
+    linhas = [f"Partidas analisadas: {agregado['partidas']} ({agregado['duplicados']} registro(s) duplicado(s) ignorado(s))"]
+    linhas.append("Modos: " + ", ".join(f"{modo}: {n}" for modo, n in sorted(agregado["modos"].items())))
+
+    linhas.append("\nVitórias por dupla:")
+    for dupla, n in sorted(agregado["duplas"].items()):
+        linhas.append(f"  {dupla}: {n} ({_taxa(n, agregado['partidas'])})")
+
+    linhas.append("\nTaxa de vitória por assento:")
+    for assento, stats in sorted(agregado["assentos"].items()):
+        linhas.append(f"  Assento {assento}: {_taxa(stats['vitorias'], stats['partidas'])} de {stats['partidas']} partida(s)")
+
+    linhas.append("\nEfeito do naipe principal (vitórias da Dupla 1 / Dupla 2):")
+    for naipe, stats in sorted(agregado["naipes"].items()):
+        linhas.append(f"  {naipe}: {stats['partidas']} partida(s), "
+                      f"{_taxa(stats.get('Dupla 1', 0), stats['partidas'])} / {_taxa(stats.get('Dupla 2', 0), stats['partidas'])}")
+
+    duracao = agregado["duracao"]
+    media = duracao["segundos"] / duracao["partidas"] if duracao["partidas"] else 0
+    linhas.append(f"\nDuração média da partida: {media:.1f}s")
+
+    linhas.append("\nTrunfos mais decisivos (rodadas vencidas):")
+    for carta, n in sorted(agregado["trunfos_decisivos"].items(), key=lambda x: x[1], reverse=True)[:top]:
+        linhas.append(f"  {carta}: {n}")
+
+    linhas.append("\nJogadores:")
+    jogadores = sorted(agregado["jogadores"].items(), key=lambda x: (x[1]["vitorias"], x[1]["partidas"]), reverse=True)
+    for nome, stats in jogadores[:top]:
+        linhas.append(f"  {nome}: {stats['partidas']} partida(s), {stats['vitorias']} vitória(s) "
+                      f"({_taxa(stats['vitorias'], stats['partidas'])}), {stats['rodadas']} rodada(s) vencida(s)")
+    return "\n".join(linhas)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Estatísticas do histórico de partidas do Dourado.")
+    parser.add_argument("arquivo", nargs="?", default=ARQUIVO_PADRAO, help="Arquivo CSV com o histórico")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="Número de processos")
+    parser.add_argument("--chunk", type=int, default=CHUNK_PADRAO, help="Registros por bloco")
+    parser.add_argument("--top", type=int, default=10, help="Quantidade de itens nas listas")
+    parser.add_argument("--jogador", help="Mostra apenas as estatísticas de um jogador")
+    parser.add_argument("--sem-cache", action="store_true", help="Reprocessa o arquivo inteiro sem usar o cache")
+    args = parser.parse_args()
+
+    agregado, novos = compute_stats(args.arquivo, workers=args.workers, chunk_size=args.chunk,
+                                    usar_cache=not args.sem_cache)
+    print(f"[STATS] {novos} registro(s) novo(s) processado(s).")
+    if args.jogador:
+        stats = agregado["jogadores"].get(args.jogador)
+        if not stats:
+            print(f"Jogador {args.jogador} não encontrado.")
+            return 1
+        print(f"{args.jogador}: {stats['partidas']} partida(s), {stats['vitorias']} vitória(s) "
+              f"({_taxa(stats['vitorias'], stats['partidas'])}), {stats['rodadas']} rodada(s) vencida(s)")
+    else:
+        print(format_report(agregado, top=args.top))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,135 @@
+import gc
+import random
+import timeit
+import tracemalloc
+
+import server
+
+# ------------------------------------------
+# Benchmark do Caminho Quente do handle_client
+# ------------------------------------------
+N = 200000
+N_SALAS = 20000
+
+
+# Implementações anteriores, mantidas aqui apenas como base de comparação
+def parse_antigo(chosen_card):
+    """Parsing de carta como era feito em register_move_multiplayer/play_step."""
+    card_map = {'E': 'Espadas', 'O': 'Ouros', 'C': 'Copas', 'P': 'Paus'}
+    rank_map = {'K': 'K', 'Q': 'Q', 'J': 'J'}
+    if len(chosen_card) < 2:
+        raise ValueError("Formato inválido. Exemplo: 'Kc' para Rei de Copas.")
+    raw_value = chosen_card[:-1]
+    suit_letter = chosen_card[-1].upper()
+    if raw_value.upper() in rank_map:
+        value = rank_map[raw_value.upper()]
+    else:
+        value = raw_value
+    suit = card_map.get(suit_letter)
+    if not suit:
+        raise ValueError(f"Naipe inválido: {chosen_card[-1]}")
+    return (value, suit)
+
+
+def format_card_antigo(card):
+    """format_card com o value_map recriado a cada chamada."""
+    value, suit = card
+    value_map = {
+        '1': '1', '2': '2', '3': '3', '4': '4', '5': '5',
+        '6': '6', '7': '7', '8': '8', '9': '9', '10': '10',
+        'Q': 'Q', 'J': 'J', 'K': 'K', 'A': 'A'
+    }
+    return f"{value_map.get(value, value)} de {suit}"
+
+
+def get_hand_antigo(hand):
+    return ", ".join([format_card_antigo(card) for card in hand])
+
+
+def menu_antigo(finished):
+    """Menu montado e codificado a cada iteração do loop do handle_client."""
+    if finished:
+        menu = ("\nA partida acabou!\n"
+                "6. Jogar novamente (desconecte e reconecte para nova partida)\n"
+                "7. Mostrar Ranking\n"
+                "5. Sair\n"
+                "Digite sua opção: ")
+    else:
+        menu = ("\nEscolha uma opção:\n"
+                "1. Jogar próxima rodada\n"
+                "2. Ver histórico\n"
+                "3. Ver minha mão\n"
+                "4. Jogar automaticamente\n"
+                "7. Mostrar Ranking\n"
+                "5. Sair\n"
+                "Digite sua opção: ")
+    return menu.encode()
+
+
+def opcao_antiga(opcao_str):
+    try:
+        return int(opcao_str)
+    except ValueError:
+        return None
+
+
+def sala_antiga():
+    """Ciclo de uma sala antes do GAME_POOL: DouradoGame novo e um random.Random novo por partida."""
+    game = server.DouradoGame()
+    game.verbose = False
+    game.rng = random.Random()
+    game.start_game()
+
+
+def sala_pool():
+    """Ciclo atual: partida retirada do pool, gerador re-semeado em start_game e devolução com release."""
+    game = server.GAME_POOL.checkout()
+    game.verbose = False
+    game.start_game()
+    server.GAME_POOL.release(game)
+
+
+def medir_alocacao(func, n=N_SALAS):
+    """Retorna (coletas do GC na geração 0 a cada 1000 chamadas, pico de memória alocada durante uma partida, em KiB) para 'func'."""
+    gc.collect()
+    coletas = gc.get_stats()[0]["collections"]
+    tracemalloc.start()
+    for _ in range(n):
+        func()
+    pico = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return (gc.get_stats()[0]["collections"] - coletas) * 1000 / n, pico / 1024
+
+
+def medir(func):
+    """Executa 'func' N vezes (melhor de 5) e retorna o tempo médio por chamada em ns."""
+    return min(timeit.repeat(func, number=N, repeat=5)) / N * 1e9
+
+
+def main():
+    game = server.DouradoGame()
+    game.hands = [[('K', 'Copas'), ('10', 'Ouros'), ('3', 'Espadas')]]
+    casos = [
+        ("parse_card", lambda: parse_antigo('10o'), lambda: server.parse_card_input('10o')),
+        ("format_card", lambda: format_card_antigo(('10', 'Ouros')), lambda: game.format_card(('10', 'Ouros'))),
+        ("get_hand", lambda: get_hand_antigo(game.hands[0]), lambda: game.get_hand(0)),
+        ("menu", lambda: menu_antigo(game.finished),
+         lambda: server.MENU_FIM if game.finished else server.MENU_PARTIDA),
+        ("opcao", lambda: opcao_antiga("4"), lambda: server.MENU_OPTIONS.get("4")),
+    ]
+    print(f"{'caso':<14} {'antes':>10} {'depois':>10}  (ns/chamada, melhor de 5 x {N})")
+    for nome, antes, depois in casos:
+        t_antes, t_depois = medir(antes), medir(depois)
+        print(f"{nome:<14} {t_antes:10.1f} {t_depois:10.1f}  {t_antes / t_depois:.1f}x")
+
+    server.GAME_POOL.preallocate(1)
+    t_antes = min(timeit.repeat(sala_antiga, number=N_SALAS, repeat=5)) / N_SALAS * 1e6
+    t_depois = min(timeit.repeat(sala_pool, number=N_SALAS, repeat=5)) / N_SALAS * 1e6
+    print(f"\n{'sala':<14} {t_antes:10.1f} {t_depois:10.1f}  {t_antes / t_depois:.1f}x  (µs/partida, {N_SALAS} partidas)")
+    for nome, func in (("antes", sala_antiga), ("depois", sala_pool)):
+        coletas, pico = medir_alocacao(func)
+        print(f"  {nome:<12} {coletas:.1f} coleta(s) gen0/1000 partidas, pico de {pico:.1f} KiB por partida")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,323 @@
+import argparse
+import ast
+import csv
+import hashlib
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+
+from server import DouradoGame
+
+# ------------------------------------------
+# Replay e Verificação de Partidas Arquivadas
+# ------------------------------------------
+ARQUIVO_PADRAO = "game_data.csv"
+BATCH_PADRAO = 500   # Registros por lote enviado a cada processo
+
+# Nomes usados no histórico (versões antigas gravavam os nomes por extenso)
+NOMES_VALORES = {'Rei': 'K', 'Dama': 'Q', 'Valete': 'J', 'Ás': 'A'}
+
+RE_VENCEDOR_RODADA = re.compile(r"^(.*) venceu a rodada\. Motivo: A carta (.+) foi a maior\.$")
+RE_FIM_PARTIDA = re.compile(r"^Dupla (\d) venceu a partida com placar \[(\d+), (\d+)\]$")
+
+
+def parse_card(texto):
+    """Converte o texto de uma carta do histórico ('K de Copas', 'Rei de Copas') em tupla (valor, naipe)."""
+    value, sep, suit = texto.strip().rpartition(" de ")
+    if not sep:
+        raise ValueError(f"Carta inválida no histórico: {texto}")
+    return NOMES_VALORES.get(value, value), suit
+
+
+def parse_record(row):
+    """
+    Extrai de uma linha do CSV tudo o que é necessário para refazer a partida:
+    jogadores, carta virada, mãos distribuídas, jogadas e vencedores de cada rodada e placar final.
+    """
+    registro = {
+        "modo": row.get("Modo", ""),
+        "jogadores": [nome.strip() for nome in row.get("Jogadores", "").split(", ")],
+        "trump_card": None,
+        "trump_suit": row.get("Naipe Principal") or None,
+        "hands": [],
+        "rodadas": [],        # Lista de listas [(nome, carta), ...] na ordem das jogadas
+        "vencedores": [],     # Lista de (nome, carta) de cada rodada
+        "vencedor_final": None,
+        "placar": None,
+        "seed": None,         # Seed do baralho (registros gravados a partir da inclusão da seed)
+    }
+    if row.get("Carta Virada"):
+        registro["trump_card"] = ast.literal_eval(row["Carta Virada"])
+
+    for item in row.get("Histórico", "").split(" || "):
+        item = item.strip()
+        if item.startswith("Carta virada (Bebi): ") and registro["trump_card"] is None:
+            registro["trump_card"] = parse_card(item.split(": ", 1)[1])
+        elif item.startswith("Naipe principal: ") and not registro["trump_suit"]:
+            registro["trump_suit"] = item.split(": ", 1)[1]
+        elif item.startswith("Cartas distribuídas:"):
+            for linha in item.split("\n")[1:]:
+                _, _, cartas = linha.partition(": ")
+                registro["hands"].append([parse_card(c) for c in cartas.split(", ")])
+        elif item.startswith("Rodada: "):
+            jogadas = []
+            for jogada in item[len("Rodada: "):].split(", "):
+                nome, _, carta = jogada.rpartition(": ")
+                jogadas.append((nome, parse_card(carta)))
+            registro["rodadas"].append(jogadas)
+        elif RE_VENCEDOR_RODADA.match(item):
+            nome, carta = RE_VENCEDOR_RODADA.match(item).groups()
+            registro["vencedores"].append((nome, parse_card(carta)))
+        elif item.startswith("Seed: "):
+            registro["seed"] = int(item[len("Seed: "):])
+        elif RE_FIM_PARTIDA.match(item) and registro["vencedor_final"] is None:
+            registro["vencedor_final"] = int(RE_FIM_PARTIDA.match(item).group(1))
+
+    if row.get("Placar"):
+        registro["placar"] = list(ast.literal_eval(row["Placar"]))
+    return registro
+
+
+def chave_registro(row):
+    """
+    Identifica a partida de uma linha do CSV por jogadores, início e histórico. A linha final
+    "Dupla N venceu a partida" e a seed são ignoradas, pois versões antigas gravavam a mesma
+    partida duas vezes, a segunda com a linha final repetida.
+    """
+    historico = [item for item in row.get("Histórico", "").split(" || ")
+                 if not item.startswith("Seed: ") and not RE_FIM_PARTIDA.match(item)]
+    chave = "\n".join([row.get("Jogadores", ""), row.get("Início da Partida", "")] + historico)
+    return hashlib.sha1(chave.encode("utf-8")).hexdigest()
+
+
+def build_game(registro):
+    """Reconstrói um DouradoGame (sem sockets) no estado logo após a distribuição das cartas."""
+    num_cards = len(registro["hands"][0]) if registro["hands"] else 3
+    game = DouradoGame(mode=20 if num_cards == 3 else 52, singleplayer=registro["modo"] == "Singleplayer")
+    game.player_names = list(registro["jogadores"])
+    game.trump_card = registro["trump_card"]
+    game.trump_suit = registro["trump_suit"] or (game.trump_card[1] if game.trump_card else None)
+    game.hands = [list(hand) for hand in registro["hands"]]
+    game.cards_played = {nome: [] for nome in game.player_names}
+    game.started = True
+    return game
+
+
+def replay_record(row, linha=None):
+    """
+    Refaz uma partida arquivada e confere cada rodada com card_value.
+    Retorna {"linha", "ok", "parcial", "divergencias"}. Uma partida é "parcial" quando o histórico
+    não traz as jogadas (registros multiplayer antigos): nesse caso só o placar é conferido.
+    """
+    resultado = {"linha": linha, "ok": True, "parcial": False, "divergencias": []}
+    try:
+        registro = parse_record(row)
+        game = build_game(registro)
+    except (ValueError, SyntaxError, IndexError) as e:
+        resultado["ok"] = False
+        resultado["divergencias"].append(f"Registro ilegível: {e}")
+        return resultado
+
+    divergencias = resultado["divergencias"]
+    if len(game.hands) < len(game.player_names):
+        resultado["ok"] = False
+        divergencias.append("Registro sem as cartas distribuídas.")
+        return resultado
+    if registro["rodadas"]:
+        if len(registro["rodadas"]) != len(registro["vencedores"]):
+            divergencias.append("Número de rodadas diferente do número de vencedores registrados.")
+        for n, jogadas in enumerate(registro["rodadas"], start=1):
+            moves = {}
+            for i, (nome, carta) in enumerate(jogadas):
+                if carta not in game.hands[i]:
+                    divergencias.append(f"Rodada {n}: {nome} jogou {game.format_card(carta)}, que não estava na mão.")
+                else:
+                    game.hands[i].remove(carta)
+                moves[i] = carta
+            vencedor = game.resolve_trick(moves)
+            game.montes[vencedor % 2] += 1
+            if n <= len(registro["vencedores"]):
+                nome_registrado, carta_registrada = registro["vencedores"][n - 1]
+                if (nome_registrado, carta_registrada) != (jogadas[vencedor][0], moves[vencedor]):
+                    divergencias.append(
+                        f"Rodada {n}: registrado {nome_registrado} ({game.format_card(carta_registrada)}), "
+                        f"recalculado {jogadas[vencedor][0]} ({game.format_card(moves[vencedor])})."
+                    )
+    else:
+        # Sem as jogadas só é possível refazer o placar a partir dos vencedores registrados
+        resultado["parcial"] = True
+        for nome, carta in registro["vencedores"]:
+            indices = [i for i, hand in enumerate(game.hands) if carta in hand]
+            if not indices or game.player_names[indices[0]] != nome:
+                divergencias.append(f"{nome} não tinha a carta vencedora {game.format_card(carta)}.")
+            if indices:
+                game.hands[indices[0]].remove(carta)
+                game.montes[indices[0] % 2] += 1
+
+    if registro["seed"] is not None:
+        divergencias.extend(verify_seed(registro, game.mode))
+
+    if registro["placar"] is not None and game.montes != registro["placar"]:
+        divergencias.append(f"Placar registrado {registro['placar']}, recalculado {game.montes}.")
+    vencedor_texto = "Dupla 1" if game.montes[0] > game.montes[1] else "Dupla 2"
+    aceitos = {vencedor_texto}
+    # Partidas encerradas por desistência terminam com mãos não vazias; o vencedor gravado é o declarado
+    # no histórico (registros antigos gravavam o vencedor pelo placar)
+    completa = all(len(hand) == 0 for hand in game.hands)
+    if not completa and registro["vencedor_final"] is not None:
+        aceitos.add(f"Dupla {registro['vencedor_final']}")
+    if row.get("Vencedor") and row["Vencedor"] not in aceitos:
+        divergencias.append(f"Vencedor registrado {row['Vencedor']}, recalculado {' ou '.join(sorted(aceitos))}.")
+    if completa and registro["vencedor_final"] is not None and f"Dupla {registro['vencedor_final']}" != vencedor_texto:
+        divergencias.append(f"Histórico declara Dupla {registro['vencedor_final']}, recalculado {vencedor_texto}.")
+
+    resultado["ok"] = not divergencias
+    return resultado
+
+
+def replay_from_seed(seed, mode, moves, player_names=None, singleplayer=True):
+    """
+    Refaz uma partida a partir da seed e do log de jogadas.
+    'moves' é uma lista de rodadas; cada rodada é uma lista de cartas (tuplas) na ordem dos assentos.
+    Retorna o DouradoGame com montes e histórico recalculados.
+    """
+    game = DouradoGame(mode=mode, singleplayer=singleplayer, seed=seed)
+    game.verbose = False
+    game.player_names = list(player_names or ["Jogador1", "Bot1", "Bot2", "Bot3"])
+    game.start_game()
+    game.deal_cards()
+    for n, rodada in enumerate(moves, start=1):
+        jogadas = {}
+        for i, carta in enumerate(rodada):
+            carta = tuple(carta)
+            if carta not in game.hands[i]:
+                raise ValueError(f"Rodada {n}: a carta {game.format_card(carta)} não está na mão de {game.player_names[i]}.")
+            game.hands[i].remove(carta)
+            jogadas[i] = carta
+        vencedor = game.resolve_trick(jogadas)
+        game.montes[vencedor % 2] += 1
+        round_moves_str = ", ".join([f"{game.player_names[i]}: {game.format_card(jogadas[i])}" for i in jogadas])
+        game.history.append(f"Rodada: {round_moves_str}")
+        game.history.append(f"{game.player_names[vencedor]} venceu a rodada. "
+                            f"Motivo: A carta {game.format_card(jogadas[vencedor])} foi a maior.")
+    return game
+
+
+def verify_seed(registro, mode):
+    """
+    Refaz a partida a partir da seed gravada e das jogadas do histórico e confere carta virada,
+    mãos distribuídas, vencedor de cada rodada e placar com o registro. Retorna a lista de divergências.
+    """
+    seed = registro["seed"]
+    moves = [[carta for _, carta in jogadas] for jogadas in registro["rodadas"]]
+    try:
+        game = replay_from_seed(seed, mode, moves, registro["jogadores"], registro["modo"] == "Singleplayer")
+    except ValueError as e:
+        return [f"Seed {seed}: {e}"]
+    divergencias = []
+    if game.trump_card != registro["trump_card"]:
+        divergencias.append(f"Seed {seed}: carta virada {game.format_card(game.trump_card)} difere da registrada.")
+    distribuidas = [list(hand) for hand in registro["hands"]]
+    for jogadas in registro["rodadas"]:
+        for i, (_, carta) in enumerate(jogadas):
+            game.hands[i].append(carta)  # Devolve as cartas jogadas para comparar as mãos iniciais
+    if [sorted(hand) for hand in game.hands] != [sorted(hand) for hand in distribuidas]:
+        divergencias.append(f"Seed {seed}: mãos distribuídas diferem das registradas.")
+    vencedores = [RE_VENCEDOR_RODADA.match(item).group(1) for item in game.history if RE_VENCEDOR_RODADA.match(item)]
+    if vencedores != [nome for nome, _ in registro["vencedores"]]:
+        divergencias.append(f"Seed {seed}: vencedores das rodadas {vencedores} diferem dos registrados.")
+    if registro["placar"] is not None and game.montes != registro["placar"]:
+        divergencias.append(f"Seed {seed}: placar refeito {game.montes} difere do registrado {registro['placar']}.")
+    return divergencias
+
+
+def _replay_batch(batch):
+    """Executa o replay de um lote [(linha, row), ...] dentro de um processo trabalhador."""
+    return [replay_record(row, linha) for linha, row in batch]
+
+
+def iter_batches(filename, batch_size):
+    """Lê o arquivo CSV em lotes de (linha, row), sem carregar o arquivo inteiro na memória."""
+    with open(filename, newline="", encoding="utf-8") as file:
+        batch = []
+        for linha, row in enumerate(csv.DictReader(file), start=1):
+            batch.append((linha, row))
+            if len(batch) == batch_size:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
+
+
+def map_bounded(executor, func, iterable, janela):
+    """
+    Como executor.map, mas com no máximo 'janela' tarefas em andamento: o próximo item só é lido
+    do iterável quando uma tarefa termina, mantendo a leitura do arquivo em fluxo.
+    Os resultados saem na ordem em que as tarefas terminam.
+    """
+    pendentes = set()
+    for item in iterable:
+        if len(pendentes) >= janela:
+            done, pendentes = wait(pendentes, return_when=FIRST_COMPLETED)
+            for future in done:
+                yield future.result()
+        pendentes.add(executor.submit(func, item))
+    while pendentes:
+        done, pendentes = wait(pendentes, return_when=FIRST_COMPLETED)
+        for future in done:
+            yield future.result()
+
+
+def audit_archive(filename=ARQUIVO_PADRAO, workers=None, batch_size=BATCH_PADRAO):
+    """
+    Refaz todas as partidas do arquivo em lotes paralelos e retorna a lista de resultados.
+    Registros repetidos de uma mesma partida são marcados como divergentes.
+    """
+    vistos, duplicados = {}, {}  # {chave: linha}, {linha: linha do original}
+
+    def lotes():
+        for batch in iter_batches(filename, batch_size):
+            for linha, row in batch:
+                original = vistos.setdefault(chave_registro(row), linha)
+                if original != linha:
+                    duplicados[linha] = original
+            yield batch
+
+    resultados = []
+    if workers == 1:
+        for batch in lotes():
+            resultados.extend(_replay_batch(batch))
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            janela = 2 * (workers or os.cpu_count() or 1)
+            for lote in map_bounded(executor, _replay_batch, lotes(), janela):
+                resultados.extend(lote)
+        resultados.sort(key=lambda r: r["linha"])
+    for r in resultados:
+        if r["linha"] in duplicados:
+            r["ok"] = False
+            r["divergencias"].append(f"Registro duplicado da linha {duplicados[r['linha']]}.")
+    return resultados
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Refaz e verifica as partidas arquivadas do Dourado.")
+    parser.add_argument("arquivo", nargs="?", default=ARQUIVO_PADRAO, help="Arquivo CSV com o histórico")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="Número de processos")
+    parser.add_argument("--batch", type=int, default=BATCH_PADRAO, help="Registros por lote")
+    args = parser.parse_args()
+
+    resultados = audit_archive(args.arquivo, workers=args.workers, batch_size=args.batch)
+    divergentes = [r for r in resultados if not r["ok"]]
+    parciais = sum(1 for r in resultados if r["parcial"])
+    for r in divergentes:
+        print(f"[REPLAY] Linha {r['linha']}:")
+        for d in r["divergencias"]:
+            print(f"    {d}")
+    print(f"[REPLAY] {len(resultados)} partida(s) verificada(s), {len(divergentes)} com divergência, "
+          f"{parciais} verificada(s) apenas pelo placar.")
+    return 1 if divergentes else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
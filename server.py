@@ -1,10 +1,40 @@
+import time
+BOOT_T0 = time.perf_counter()  # Antes dos demais imports, para medir o tempo de importação
+
 import socket
 import threading
 import random
+import secrets
 import csv
-import time
 from datetime import datetime
 import os
+import select
+import itertools
+import argparse
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from collections import OrderedDict
+
+# ------------------------------------------
+# Perfil de Inicialização
+# ------------------------------------------
+PROFILE_STARTUP = False     # Ativado com --profile-startup
+startup_marks = [("imports", time.perf_counter() - BOOT_T0)]  # [(etapa, segundos desde BOOT_T0)]
+
+def mark_startup(etapa):
+    """Registra o tempo decorrido desde o início do carregamento do servidor até 'etapa'."""
+    elapsed = time.perf_counter() - BOOT_T0
+    startup_marks.append((etapa, elapsed))
+    if PROFILE_STARTUP:
+        print(f"[BOOT] {etapa}: {elapsed * 1000:.1f} ms")
+
+def startup_report():
+    """Monta o relatório com o tempo acumulado e o tempo de cada etapa da inicialização."""
+    linhas = ["[BOOT] Relatório de inicialização:"]
+    anterior = 0.0
+    for etapa, elapsed in sorted(startup_marks, key=lambda x: x[1]):
+        linhas.append(f"    {etapa:<28} {elapsed * 1000:8.1f} ms  (+{(elapsed - anterior) * 1000:.1f} ms)")
+        anterior = elapsed
+    return "\n".join(linhas)
 
 # ------------------------------------------
 # Configuração para Descoberta via UDP
@@ -22,11 +52,20 @@ def get_local_ip():
     local_ip = socket.gethostbyname(hostname)
     return local_ip
 
-# Obtém o IP local e armazena em uma variável
-LOCAL_IP = get_local_ip()
+# IP local, resolvido em segundo plano depois que os sockets já estão escutando
+# (gethostbyname pode travar por segundos com um resolvedor mal configurado)
+LOCAL_IP = None
 
-# Exibe o IP local no terminal
-print(f"[INFO] IP local do servidor: {LOCAL_IP}")
+def resolve_local_ip():
+    """Resolve o IP local fora do caminho de inicialização e o exibe no terminal."""
+    global LOCAL_IP
+    try:
+        LOCAL_IP = get_local_ip()
+    except OSError as e:
+        print(f"[INFO] Não foi possível resolver o IP local: {e}")
+        return
+    mark_startup("resolução do IP local")
+    print(f"[INFO] IP local do servidor: {LOCAL_IP}")
 
 def udp_discovery():
     """
@@ -35,6 +74,7 @@ def udp_discovery():
     udp_socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
     udp_socket.setsockopt(socket.SOL_SOCKET, socket.SO_BROADCAST, 1)
     udp_socket.bind(("", UDP_PORT))
+    mark_startup("bind UDP")
     print(f"[UDP] Servidor de descoberta iniciado na porta {UDP_PORT}...")
     while True:
         try:
@@ -72,11 +112,128 @@ def obter_ranking_formatado():
         ranking_str += f"{nome}: {pontos} vitória(s)\n"
     return ranking_str
 
+# ------------------------------------------
+# Tabelas de Cartas e Mensagens Pré-codificadas
+# ------------------------------------------
+SUITS = ['Ouros', 'Espadas', 'Copas', 'Paus']
+VALUES = ['1','2','3','4','5','6','7','8','9','10','Q','J','K','A']
+SUIT_LETTERS = {'E': 'Espadas', 'O': 'Ouros', 'C': 'Copas', 'P': 'Paus'}
+NORMAL_VALUES = {
+    'A': 14, 'K': 13, 'Q': 12, 'J': 11,
+    '10': 10, '9': 9, '8': 8, '7': 7,
+    '6': 6, '5': 5, '4': 4, '3': 3,
+    '2': 2, '1': 1
+}
+# Entrada do jogador (já em maiúsculas, ex: "KC", "10O") -> carta
+CARD_TOKENS = {f"{v}{letter}": (v, suit) for v in VALUES for letter, suit in SUIT_LETTERS.items()}
+# Baralhos em ordem fixa (embaralhados por partida em create_deck)
+DECK_20 = [(v, s) for s in SUITS for v in VALUES if v in ['K','J','Q','A']] + \
+          [('3', 'Espadas'), ('3', 'Paus'), ('2', 'Paus'), ('2', 'Espadas')]
+DECK_52 = [(v, s) for s in SUITS for v in VALUES]
+# Carta -> texto exibido
+CARD_LABELS = {(v, s): f"{v} de {s}" for v in VALUES for s in SUITS}
+# Opções dos menus
+MENU_OPTIONS = {str(n): n for n in range(1, 8)}
+
+MENU_INICIAL = ("Escolha o modo de jogo:\n"
+                "1. Jogar contra a máquina (Singleplayer)\n"
+                "2. Jogar multiplayer\n"
+                "3. Entrar em um torneio (duplas por ordem de chegada)\n").encode()
+MENU_PARTIDA = ("\nEscolha uma opção:\n"
+                "1. Jogar próxima rodada\n"
+                "2. Ver histórico\n"
+                "3. Ver minha mão\n"
+                "4. Jogar automaticamente\n"
+                "7. Mostrar Ranking\n"
+                "5. Sair\n"
+                "Digite sua opção: ").encode()
+MENU_FIM = ("\nA partida acabou!\n"
+            "6. Jogar novamente (desconecte e reconecte para nova partida)\n"
+            "7. Mostrar Ranking\n"
+            "5. Sair\n"
+            "Digite sua opção: ").encode()
+MSG_NOME = "Digite seu nome: ".encode()
+MSG_MODALIDADE = "Escolha a modalidade (digite 20 ou 52): ".encode()
+MSG_ENTRADA_INVALIDA = "Entrada inválida. Encerrando conexão.\n".encode()
+MSG_MODALIDADE_INVALIDA = "Modalidade inválida. Encerrando conexão.\n".encode()
+MSG_AGUARDE = "Aguarde, não é sua vez.\n".encode()
+MSG_OPCAO_INVALIDA = "Opção inválida!\n".encode()
+MSG_JOGAR_NOVAMENTE = "Para jogar novamente, desconecte e reconecte.\n".encode()
+MSG_SAINDO = "Saindo...\n".encode()
+MSG_SEM_CARTAS = "Você não tem mais cartas para jogar!\n".encode()
+MSG_DIGITE_CARTA = "Digite a carta (ex: Kc para Rei de Copas ou 'auto'): ".encode()
+
+def parse_card_input(chosen_card):
+    """
+    Converte a entrada do jogador (ex: 'Kc', '10o') na carta correspondente usando CARD_TOKENS.
+    Lança ValueError com a mesma mensagem exibida ao jogador quando a entrada é inválida.
+    """
+    token = chosen_card.strip().upper()
+    card = CARD_TOKENS.get(token)
+    if card is not None:
+        return card
+    if len(token) < 2:
+        raise ValueError("Formato inválido. Exemplo: 'Kc' para Rei de Copas.")
+    suit = SUIT_LETTERS.get(token[-1])
+    if not suit:
+        raise ValueError(f"Naipe inválido: {chosen_card.strip()[-1]}")
+    return (chosen_card.strip()[:-1], suit)
+
+# ------------------------------------------
+# Cache de Resultados de Rodada
+# ------------------------------------------
+class TrickCache:
+    """
+    Cache LRU limitado, compartilhado entre todas as salas, com contadores de acertos e falhas.
+    A chave é o estado canônico da rodada: (naipe principal, cartas na mesa em ordem de jogada);
+    o naipe inicial é sempre o da primeira carta, então não precisa fazer parte da chave.
+    """
+    def __init__(self, maxsize=8192):
+        self.maxsize = maxsize
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+
+    def get_or_compute(self, key, compute):
+        with self.lock:
+            if key in self.entries:
+                self.entries.move_to_end(key)
+                self.hits += 1
+                return self.entries[key]
+            self.misses += 1
+        value = compute()
+        with self.lock:
+            self.entries[key] = value
+            if len(self.entries) > self.maxsize:
+                self.entries.popitem(last=False)
+        return value
+
+    def stats(self):
+        with self.lock:
+            total = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "size": len(self.entries),
+                "hit_rate": self.hits / total if total else 0.0,
+            }
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+TRICK_CACHE = TrickCache()
+
 # ------------------------------------------
 # Classe do Jogo - Dourado
 # ------------------------------------------
+CSV_LOCK = threading.Lock()  # Serializa a escrita no CSV entre salas simultâneas
+
 class DouradoGame:
-    def __init__(self, mode=20, singleplayer=False):
+    def __init__(self, mode=20, singleplayer=False, seed=None):
         self.players = []             # Sockets dos jogadores
         self.deck = []                # Baralho de cartas
         self.trump_card = None        # Carta virada (Bebi)
@@ -93,6 +250,9 @@ class DouradoGame:
         self.singleplayer = singleplayer
         self.finished = False         # Partida finalizada
         self.started = False          # Partida iniciada
+        self.winner_team = None       # Dupla vencedora (1 ou 2) após end_game
+        self.persist = True           # Atualiza ranking e game_data.csv ao terminar
+        self.verbose = True           # Exibe o andamento da partida no terminal
         self.lock = threading.Lock()  # Para sincronização
         # Controle de rodada (para multiplayer)
         self.current_round = {}       # {player_index: carta_jogada}
@@ -100,24 +260,29 @@ class DouradoGame:
         self.round_result_computed = False
         self.current_turn = 0         # Índice do jogador cuja vez é
         self.leading_suit = None      # Naipe inicial da rodada
+        # Gerador aleatório próprio da partida. Sem seed fixa, cada start_game sorteia uma nova;
+        # a seed usada é gravada no histórico para que a partida possa ser refeita pelo replay.py
+        self.seed = seed
+        self.game_seed = seed
+        self.rng = random.Random(seed)
+
+    def log(self, message):
+        """Exibe uma mensagem da partida no terminal, a menos que verbose esteja desligado."""
+        if self.verbose:
+            print(message)
 
     def create_deck(self):
         """Cria o baralho conforme a modalidade."""
-        suits = ['Ouros', 'Espadas', 'Copas', 'Paus']
-        values = ['1','2','3','4','5','6','7','8','9','10','Q','J','K','A']
-        if self.mode == 20:
-            deck = [card for card in [(v, s) for s in suits for v in values] if card[0] in ['K','J','Q','A']]
-            extras = [('3', 'Espadas'), ('3', 'Paus'), ('2', 'Paus'), ('2', 'Espadas')]
-            deck += extras
-        else:
-            deck = [(v, s) for s in suits for v in values]
-        random.shuffle(deck)
+        deck = list(DECK_20 if self.mode == 20 else DECK_52)
+        self.rng.shuffle(deck)
         self.deck = deck
-        print(f"[GAME] Baralho criado com {len(deck)} cartas.")
+        self.log(f"[GAME] Baralho criado com {len(deck)} cartas.")
 
     def start_game(self):
         """Inicializa o jogo, criando o baralho e definindo a carta virada."""
         with self.lock:
+            self.game_seed = self.seed if self.seed is not None else secrets.randbits(32)
+            self.rng.seed(self.game_seed)  # Reaproveita o gerador (partidas do GAME_POOL)
             self.create_deck()
             if not self.deck:
                 raise ValueError("O baralho está vazio.")
@@ -127,8 +292,8 @@ class DouradoGame:
             self.history.append(f"Naipe principal: {self.trump_suit}")
             self.game_start_time = datetime.now()
             self.current_turn = 0
-            print("[GAME] Jogo iniciado.")
-            print(f"[GAME] Naipe da virada: {self.trump_suit}")
+            self.log("[GAME] Jogo iniciado.")
+            self.log(f"[GAME] Naipe da virada: {self.trump_suit}")
 
     def deal_cards(self):
         """Distribui as cartas para os 4 jogadores."""
@@ -139,8 +304,8 @@ class DouradoGame:
         for _ in range(4):
             hand = [self.deck.pop() for _ in range(num_cards)]
             self.hands.append(hand)
-        print("[GAME] Cartas distribuídas:")
-        for i in range(4):
+        self.log("[GAME] Cartas distribuídas:")
+        for i in range(len(self.players)):
             try:
                 self.players[i].send(f"Suas cartas: {self.get_hand(i)}\n".encode())
             except Exception as e:
@@ -153,7 +318,7 @@ class DouradoGame:
             self.players.append(player_socket)
             self.player_names.append(player_name)
             self.cards_played[player_name] = []
-            print(f"[GAME] Jogador adicionado: {player_name}")
+            self.log(f"[GAME] Jogador adicionado: {player_name}")
 
     def broadcast(self, message):
         """Envia uma mensagem para todos os jogadores."""
@@ -165,13 +330,11 @@ class DouradoGame:
 
     def format_card(self, card):
         """Formata a carta para exibição."""
-        value, suit = card
-        value_map = {
-            '1': '1', '2': '2', '3': '3', '4': '4', '5': '5',
-            '6': '6', '7': '7', '8': '8', '9': '9', '10': '10',
-            'Q': 'Q', 'J': 'J', 'K': 'K', 'A': 'A'
-        }
-        return f"{value_map.get(value, value)} de {suit}"
+        label = CARD_LABELS.get(card)
+        if label is None:
+            value, suit = card
+            label = f"{value} de {suit}"
+        return label
 
     def get_hand(self, player_index):
         """Retorna a mão do jogador de forma legível."""
@@ -184,18 +347,12 @@ class DouradoGame:
         self.history.append(f"Cartas distribuídas:\n{hands_summary}")
         self.broadcast(f"Carta Virada (Bebi): {self.format_card(self.trump_card)}\n")
         self.broadcast(f"Naipe Principal: {self.trump_suit}\n")
-        print("[GAME] Mãos distribuídas:")
-        print(hands_summary)
+        self.log("[GAME] Mãos distribuídas:")
+        self.log(hands_summary)
 
     def normal_card_value(self, value):
         """Retorna o valor numérico base da carta."""
-        values = {
-            'A': 14, 'K': 13, 'Q': 12, 'J': 11,
-            '10': 10, '9': 9, '8': 8, '7': 7,
-            '6': 6, '5': 5, '4': 4, '3': 3,
-            '2': 2, '1': 1
-        }
-        return values.get(value, 0)
+        return NORMAL_VALUES.get(value, 0)
 
     def card_value(self, card, leading_suit):
         """Define o valor para comparação das cartas com base na hierarquia especificada."""
@@ -240,63 +397,83 @@ class DouradoGame:
             normal_value = self.normal_card_value(value)
             return (1, normal_value)
 
+    def resolve_trick(self, moves):
+        """
+        Determina o vencedor de uma rodada.
+        Recebe {player_index: carta} na ordem das jogadas; o naipe inicial é o da primeira carta não nula.
+        Retorna o índice do jogador vencedor.
+        """
+        indices = list(moves.keys())
+        cards = tuple(moves.values())
+        position = TRICK_CACHE.get_or_compute((self.trump_suit, cards), lambda: self._trick_winner_position(cards))
+        return indices[position]
+
+    def _trick_winner_position(self, cards):
+        """Calcula, sem cache, a posição da carta vencedora em uma sequência de cartas."""
+        leading_suit = None
+        for card in cards:
+            if card is not None:
+                leading_suit = card[1]
+                break
+        best_position, best_value = None, None
+        for position, card in enumerate(cards):
+            value = (0, 0) if card is None else self.card_value(card, leading_suit)
+            if best_value is None or value > best_value:
+                best_position, best_value = position, value
+        return best_position
+
+    def choose_card(self, player_index):
+        """
+        Escolhe a carta para bots e jogadas automáticas.
+        Se a dupla já está vencendo a rodada, descarta a carta mais fraca; senão joga a carta mais fraca
+        que vence a rodada e, se nenhuma vencer, a mais fraca da mão.
+        """
+        hand = self.hands[player_index]
+        on_table = {i: card for i, card in self.current_round.items() if card is not None}
+        leading_suit = next(iter(on_table.values()))[1] if on_table else None
+
+        def weakest(cards):
+            return min(cards, key=lambda card: self.card_value(card, leading_suit or card[1]))
+
+        if on_table and self.resolve_trick(on_table) % 2 == player_index % 2:
+            return weakest(hand)
+        winning = [card for card in hand
+                   if self.resolve_trick({**on_table, player_index: card}) == player_index]
+        return weakest(winning or hand)
+
     def register_move_multiplayer(self, player_index, chosen_card):
         """
         Registra a jogada no modo multiplayer e sincroniza as jogadas.
         Cada jogador só pode jogar quando for sua vez.
         Se for a última jogada da rodada, calcula o resultado, reinicia os controles e notifica os clientes.
         """
-        card_map = {'E': 'Espadas', 'O': 'Ouros', 'C': 'Copas', 'P': 'Paus'}
-        rank_map = {'K': 'K', 'Q': 'Q', 'J': 'J'}
         with self.round_condition:
             while player_index != self.current_turn:
                 self.round_condition.wait()
             if chosen_card.lower() == 'auto':
                 if not self.hands[player_index]:
                     raise ValueError("Sua mão está vazia!")
-                chosen_card_tuple = random.choice(self.hands[player_index])
+                chosen_card_tuple = self.choose_card(player_index)
             else:
-                if len(chosen_card) < 2:
-                    raise ValueError("Formato inválido. Exemplo: 'Kc' para Rei de Copas.")
-                raw_value = chosen_card[:-1]
-                suit_letter = chosen_card[-1].upper()
-                if raw_value.upper() in rank_map:
-                    value = rank_map[raw_value.upper()]
-                else:
-                    value = raw_value
-                suit = card_map.get(suit_letter)
-                if not suit:
-                    raise ValueError(f"Naipe inválido: {chosen_card[-1]}")
-                chosen_card_tuple = (value, suit)
+                chosen_card_tuple = parse_card_input(chosen_card)
                 if chosen_card_tuple not in self.hands[player_index]:
                     raise ValueError(f"A carta {self.format_card(chosen_card_tuple)} não está na sua mão.")
             self.hands[player_index].remove(chosen_card_tuple)
             self.current_round[player_index] = chosen_card_tuple
             self.broadcast(f"{self.player_names[player_index]} jogou {self.format_card(chosen_card_tuple)}")
-            print(f"[GAME] {self.player_names[player_index]} jogou {self.format_card(chosen_card_tuple)}")
+            self.log(f"[GAME] {self.player_names[player_index]} jogou {self.format_card(chosen_card_tuple)}")
             if len(self.current_round) == len(self.players):
-                round_moves = [self.current_round[i] for i in range(len(self.players))]
-                # Determinar leading_suit (primeira carta não nula)
-                leading_suit = None
-                for card in round_moves:
-                    if card is not None:
-                        leading_suit = card[1]
-                        break
-                # Calcular valores das cartas
-                card_values = []
-                for card in round_moves:
-                    if card is None:
-                        card_values.append((0, 0))
-                    else:
-                        card_values.append(self.card_value(card, leading_suit))
-                max_value = max(card_values)
-                vencedor = card_values.index(max_value)
+                round_moves = {i: self.current_round[i] for i in range(len(self.players))}
+                vencedor = self.resolve_trick(round_moves)
                 self.montes[vencedor % 2] += 1
+                round_moves_str = ", ".join([f"{self.player_names[i]}: {self.format_card(round_moves[i])}"
+                                              for i in round_moves])
+                self.history.append(f"Rodada: {round_moves_str}")
                 reason = f"A carta {self.format_card(round_moves[vencedor])} foi a maior."
                 win_msg = f"{self.player_names[vencedor]} venceu a rodada. Motivo: {reason}"
                 self.history.append(win_msg)
                 self.broadcast(win_msg)
-                print(f"[GAME] {win_msg}")
+                self.log(f"[GAME] {win_msg}")
                 self.current_round = {}
                 self.leading_suit = None  # Resetar para a próxima rodada
                 self.round_result_computed = False
@@ -322,71 +499,44 @@ class DouradoGame:
             if player_index != 0:
                 raise ValueError("No modo singleplayer, somente o jogador humano (índice 0) joga manualmente.")
             # Jogada do humano:
-            card_map = {'E': 'Espadas', 'O': 'Ouros', 'C': 'Copas', 'P': 'Paus'}
-            rank_map = {'K': 'K', 'Q': 'Q', 'J': 'J'}
             if chosen_card.lower() == 'auto':
                 if not self.hands[0]:
                     raise ValueError("Sua mão está vazia!")
-                human_card = random.choice(self.hands[0])
+                human_card = self.choose_card(0)
             else:
-                if len(chosen_card) < 2:
-                    raise ValueError("Formato inválido. Exemplo: 'Kc' para Rei de Copas.")
-                raw_value = chosen_card[:-1]
-                suit_letter = chosen_card[-1].upper()
-                if raw_value.upper() in rank_map:
-                    value = rank_map[raw_value.upper()]
-                else:
-                    value = raw_value
-                suit = card_map.get(suit_letter)
-                if not suit:
-                    raise ValueError(f"Naipe inválido: {chosen_card[-1]}")
-                human_card = (value, suit)
+                human_card = parse_card_input(chosen_card)
                 if human_card not in self.hands[0]:
                     raise ValueError(f"A carta {self.format_card(human_card)} não está na sua mão.")
             self.hands[0].remove(human_card)
             self.current_round[0] = human_card
             self.broadcast(f"{self.player_names[0]} jogou {self.format_card(human_card)}")
-            print(f"[GAME] {self.player_names[0]} jogou {self.format_card(human_card)}")
+            self.log(f"[GAME] {self.player_names[0]} jogou {self.format_card(human_card)}")
             # Simula as jogadas dos bots (índices 1, 2 e 3)
             for ai_index in range(1, len(self.players)):
                 if self.hands[ai_index]:
-                    ai_card = random.choice(self.hands[ai_index])
+                    ai_card = self.choose_card(ai_index)
                     self.hands[ai_index].remove(ai_card)
                     self.current_round[ai_index] = ai_card
                     self.broadcast(f"{self.player_names[ai_index]} jogou {self.format_card(ai_card)}")
-                    print(f"[GAME] {self.player_names[ai_index]} jogou {self.format_card(ai_card)}")
+                    self.log(f"[GAME] {self.player_names[ai_index]} jogou {self.format_card(ai_card)}")
                 else:
                     self.current_round[ai_index] = None
             valid_moves = {i: card for i, card in self.current_round.items() if card is not None}
             if not valid_moves:
                 return
-            # Determinar leading_suit (primeira carta não nula)
-            leading_suit = None
-            for card in valid_moves.values():
-                if card is not None:
-                    leading_suit = card[1]
-                    break
-            # Calcular valores das cartas
-            card_values = []
-            for card in valid_moves.values():
-                if card is None:
-                    card_values.append((0, 0))
-                else:
-                    card_values.append(self.card_value(card, leading_suit))
-            max_value = max(card_values)
-            winner_index = list(valid_moves.keys())[card_values.index(max_value)]
+            winner_index = self.resolve_trick(valid_moves)
             self.montes[winner_index % 2] += 1
             round_moves_str = ", ".join([f"{self.player_names[i]}: {self.format_card(valid_moves[i])}" 
                                           for i in valid_moves])
             round_summary = f"Rodada: {round_moves_str}"
             self.history.append(round_summary)
             self.broadcast(round_summary)
-            print(f"[GAME] {round_summary}")
+            self.log(f"[GAME] {round_summary}")
             reason = f"A carta {self.format_card(valid_moves[winner_index])} foi a maior."
             win_msg = f"{self.player_names[winner_index]} venceu a rodada. Motivo: {reason}"
             self.history.append(win_msg)
             self.broadcast(win_msg)
-            print(f"[GAME] {win_msg}")
+            self.log(f"[GAME] {win_msg}")
             self.current_round = {}
             self.leading_suit = None  # Resetar para a próxima rodada
             self.current_turn = 0
@@ -404,13 +554,17 @@ class DouradoGame:
             winner_team = winner_team_override
         else:
             winner_team = 1 if self.montes[0] > self.montes[1] else 2
+        self.winner_team = winner_team
         final_msg = f"Dupla {winner_team} venceu a partida com placar {self.montes}"
         self.history.append(final_msg)
-        atualizar_ranking(self, winner_team)
+        if self.persist:
+            atualizar_ranking(self, winner_team)
         msg_final = "Partida terminada!\n" + "\n".join(self.history) + "\n" + obter_ranking_formatado()
         self.broadcast(msg_final)
-        print(f"[GAME] {msg_final}")
-        self.save_game_data()
+        self.log(f"[GAME] {msg_final}")
+        self.log(f"[CACHE] Rodadas: {TRICK_CACHE.stats()}")
+        if self.persist:
+            self.save_game_data()
         self.finished = True
 
     def save_game_data(self):
@@ -419,34 +573,49 @@ class DouradoGame:
         Os dados incluem: Modo, Jogadores, Histórico, Vencedor, Placar, Naipe Principal, Carta Virada, Início e Término.
         """
         filename = "game_data.csv"
-        file_exists = os.path.isfile(filename)
-        
-        with open(filename, mode="a", newline="", encoding="utf-8") as file:
-            writer = csv.writer(file)
-            if not file_exists:
-                writer.writerow([
-                    "Modo", "Jogadores", "Histórico", "Vencedor", "Placar", "Naipe Principal", 
-                    "Carta Virada", "Início da Partida", "Término da Partida"
-                ])
+        with CSV_LOCK:
+            file_exists = os.path.isfile(filename)
+
+            with open(filename, mode="a", newline="", encoding="utf-8") as file:
+                writer = csv.writer(file)
+                if not file_exists:
+                    writer.writerow([
+                        "Modo", "Jogadores", "Histórico", "Vencedor", "Placar", "Naipe Principal", 
+                        "Carta Virada", "Início da Partida", "Término da Partida"
+                    ])
             
-            modo = "Singleplayer" if self.singleplayer else "Multiplayer"
-            jogadores = ", ".join(self.player_names)
-            historico = " || ".join(self.history)
-            vencedor_texto = "Dupla 1" if self.montes[0] > self.montes[1] else "Dupla 2"
-            placar = f"[{self.montes[0]}, {self.montes[1]}]"
+                modo = "Singleplayer" if self.singleplayer else "Multiplayer"
+                jogadores = ", ".join(self.player_names)
+                historico = " || ".join(self.history)
+                if self.game_seed is not None:
+                    historico += f" || Seed: {self.game_seed}"  # Apenas no arquivo, nunca enviada aos jogadores
+                if self.winner_team is not None:
+                    vencedor_texto = f"Dupla {self.winner_team}"  # Inclui vitórias por desistência
+                else:
+                    vencedor_texto = "Dupla 1" if self.montes[0] > self.montes[1] else "Dupla 2"
+                placar = f"[{self.montes[0]}, {self.montes[1]}]"
             
-            naipe_principal = self.trump_suit if self.trump_suit else ""
-            carta_virada = self.trump_card if self.trump_card else ""
+                naipe_principal = self.trump_suit if self.trump_suit else ""
+                carta_virada = self.trump_card if self.trump_card else ""
             
-            inicio = self.game_start_time.strftime("%Y-%m-%d %H:%M:%S") if self.game_start_time else ""
-            fim = self.game_end_time.strftime("%Y-%m-%d %H:%M:%S") if self.game_end_time else ""
+                inicio = self.game_start_time.strftime("%Y-%m-%d %H:%M:%S") if self.game_start_time else ""
+                fim = self.game_end_time.strftime("%Y-%m-%d %H:%M:%S") if self.game_end_time else ""
             
-            writer.writerow([modo, jogadores, historico, vencedor_texto, placar, naipe_principal, carta_virada, inicio, fim])
-            print(f"[GAME] Dados salvos em {filename}")
+                writer.writerow([modo, jogadores, historico, vencedor_texto, placar, naipe_principal, carta_virada, inicio, fim])
+                self.log(f"[GAME] Dados salvos em {filename}")
 
-    def reset_game(self):
-        """Reinicializa os dados internos para uma nova partida (mantendo os sockets conectados)."""
+    def reset_game(self, keep_players=True):
+        """
+        Reinicializa os dados internos para uma nova partida.
+        Com keep_players=True os sockets e nomes são mantidos; com False a instância fica
+        equivalente a um DouradoGame recém-criado (usado pelo GamePool).
+        """
         with self.lock:
+            if not keep_players:
+                self.players = []
+                self.player_names = []
+                self.persist = True
+                self.verbose = True
             self.deck = []
             self.trump_card = None
             self.trump_suit = None
@@ -456,25 +625,83 @@ class DouradoGame:
             self.game_start_time = None
             self.game_end_time = None
             self.played_cards = []
-            self.cards_played = {}
+            self.cards_played = {nome: [] for nome in self.player_names}
             self.finished = False
+            self.started = False
+            self.winner_team = None
+            self.game_seed = self.seed
             self.current_round = {}
             self.round_result_computed = False
             self.current_turn = 0
+            self.leading_suit = None
+
+# ------------------------------------------
+# Pool de Partidas
+# ------------------------------------------
+POOL_PREALOCADO = 32   # Partidas criadas na inicialização do servidor
+POOL_MAX = 256         # Máximo de partidas livres guardadas para reuso
+
+class GamePool:
+    """
+    Pool limitado de instâncias de DouradoGame. As salas retiram uma partida com checkout e a
+    devolvem com release quando terminam; a partida devolvida é limpa com reset_game e reaproveitada,
+    evitando recriar locks, conditions, listas e dicionários a cada sala.
+    """
+    def __init__(self, maxsize=POOL_MAX):
+        self.maxsize = maxsize
+        self.free = []
+        self.lock = threading.Lock()
+        self.created = 0
+        self.reused = 0
+
+    def preallocate(self, quantidade):
+        with self.lock:
+            while len(self.free) < min(quantidade, self.maxsize):
+                self.free.append(DouradoGame())
+                self.created += 1
+
+    def checkout(self, mode=20, singleplayer=False):
+        """Retorna uma partida limpa configurada com a modalidade e o modo pedidos."""
+        with self.lock:
+            if self.free:
+                game = self.free.pop()
+                self.reused += 1
+            else:
+                game = None
+                self.created += 1
+        if game is None:
+            game = DouradoGame(mode=mode, singleplayer=singleplayer)
+        game.mode = mode
+        game.singleplayer = singleplayer
+        return game
+
+    def release(self, game):
+        """Limpa a partida e a devolve ao pool; se o pool estiver cheio, ela é descartada."""
+        game.reset_game(keep_players=False)
+        with self.lock:
+            if len(self.free) < self.maxsize:
+                self.free.append(game)
+
+    def stats(self):
+        with self.lock:
+            return {"free": len(self.free), "created": self.created, "reused": self.reused}
+
+GAME_POOL = GamePool()
 
 # ------------------------------------------
 # Gerenciamento de Salas (para multiplayer)
 # ------------------------------------------
 game_rooms = {}  # {room_id: {"game": DouradoGame, "clients": [socket, ...]}}
 room_lock = threading.Lock()
+room_counter = itertools.count(1)  # Ids de sala não se repetem mesmo com salas liberadas
 
 def assign_room(client_socket, player_name, singleplayer_choice, modalidade):
     global game_rooms
     with room_lock:
         if singleplayer_choice:
             # Cria uma sala exclusiva para o jogador e adiciona 3 bots
-            room_id = f"SP_{player_name}_{int(time.time())}"
-            new_game = DouradoGame(mode=modalidade, singleplayer=True)
+            room_id = f"SP_{player_name}_{next(room_counter)}"
+            new_game = GAME_POOL.checkout(mode=modalidade, singleplayer=True)
             new_game.player_names.append(player_name)
             new_game.players.append(client_socket)
             # Adiciona bots (todos usarão o mesmo socket para broadcast)
@@ -487,21 +714,44 @@ def assign_room(client_socket, player_name, singleplayer_choice, modalidade):
         else:
             # Procura uma sala multiplayer que ainda não esteja completa
             for room_id, room in game_rooms.items():
-                if not room["game"].singleplayer and len(room["clients"]) < 4 and room["game"].mode == modalidade:
+                game = room["game"]
+                if not game.singleplayer and not game.started and len(room["clients"]) < 4 and game.mode == modalidade:
                     room["clients"].append(client_socket)
                     room["game"].player_names.append(player_name)
                     room["game"].players.append(client_socket)
                     print(f"[ROOM] Jogador {player_name} adicionado à sala {room_id}")
                     return room_id, room["game"]
             # Se nenhuma sala disponível, cria uma nova
-            room_id = f"M_{len(game_rooms)+1}"
-            new_game = DouradoGame(mode=modalidade, singleplayer=False)
+            room_id = f"M_{next(room_counter)}"
+            new_game = GAME_POOL.checkout(mode=modalidade, singleplayer=False)
             new_game.player_names.append(player_name)
             new_game.players.append(client_socket)
             game_rooms[room_id] = {"game": new_game, "clients": [client_socket]}
             print(f"[ROOM] Sala {room_id} criada para multiplayer.")
             return room_id, new_game
 
+def leave_room(room_id, client_socket):
+    """
+    Remove o cliente da sala. Quando a sala fica vazia ela é apagada de game_rooms
+    e a partida é devolvida ao GAME_POOL.
+    """
+    with room_lock:
+        room = game_rooms.get(room_id)
+        if room is None:
+            return
+        if client_socket in room["clients"]:
+            room["clients"].remove(client_socket)
+        game = room["game"]
+        if not game.started and client_socket in game.players:
+            # Jogador saiu antes da partida começar: libera o assento
+            i = game.players.index(client_socket)
+            game.players.pop(i)
+            game.player_names.pop(i)
+        if not room["clients"]:
+            del game_rooms[room_id]
+            GAME_POOL.release(game)
+            print(f"[ROOM] Sala {room_id} liberada. Pool: {GAME_POOL.stats()}")
+
 def send_message(clients, message):
     for client in clients:
         try:
@@ -527,37 +777,248 @@ def handle_disconnect(game, player_name):
         game.broadcast(f"O jogador {player_name} desistiu. A partida será encerrada. Dupla {winning_team} vence.\n")
         game.end_game(winner_team_override=winning_team)
 
+# ------------------------------------------
+# Torneios (chaveamento de duplas em várias mesas simultâneas)
+# ------------------------------------------
+TORNEIO_DUPLAS = 4     # Duplas necessárias para iniciar um torneio pelo menu
+MAX_MESAS = 1000       # Mesas jogadas em paralelo por torneio
+TEMPO_JOGADA = 60      # Segundos para o jogador escolher a carta; ao esgotar, a jogada é automática
+
+class BotConnection:
+    """Conexão nula usada pelos bots de torneio: as mensagens enviadas a eles são descartadas."""
+    def send(self, data):
+        return len(data)
+
+class Tournament:
+    """
+    Torneio eliminatório entre duplas. Cada confronto é uma mesa multiplayer com a dupla A nos
+    assentos 0 e 2 e a dupla B nos assentos 1 e 3. As conexões dos jogadores ficam abertas durante
+    todo o torneio, as mesas vêm do GAME_POOL e são devolvidas ao terminar, e a próxima fase de um
+    confronto é agendada assim que os dois vencedores que a alimentam são conhecidos.
+    """
+    def __init__(self, teams, mode=20, max_tables=MAX_MESAS):
+        if not teams:
+            raise ValueError("O torneio precisa de pelo menos uma dupla.")
+        self.teams = teams            # [{"nome": str, "jogadores": [jogador, jogador]}]
+        self.mode = mode
+        self.max_tables = max_tables
+        self.champion = None
+
+    def notify(self, team, message):
+        for jogador in team["jogadores"]:
+            try:
+                jogador["conn"].send(message.encode())
+            except Exception:
+                pass
+
+    def finish_player(self, team, message):
+        """Envia a mensagem final e libera as threads dos jogadores humanos da dupla."""
+        self.notify(team, message)
+        for jogador in team["jogadores"]:
+            if jogador.get("liberado") is not None:
+                jogador["liberado"].set()
+
+    def human_move(self, game, idx, conn):
+        """
+        Pede a carta ao jogador humano até receber uma jogada válida. Se o tempo de TEMPO_JOGADA
+        esgotar, a carta é escolhida automaticamente. Retorna False se ele desconectar ou desistir (5/sair).
+        """
+        while True:
+            try:
+                conn.send(f"Sua mão: {game.get_hand(idx)} (5 para desistir, {TEMPO_JOGADA}s para jogar)\n".encode())
+                conn.send(MSG_DIGITE_CARTA)
+                readable, _, _ = select.select([conn], [], [], TEMPO_JOGADA)
+                if not readable:
+                    conn.send("\n[TORNEIO] Tempo esgotado! Carta escolhida automaticamente.\n".encode())
+                    game.play_step(idx, "auto")
+                    return True
+                carta = conn.recv(1024).decode().strip()
+            except Exception:
+                return False
+            if not carta or carta.lower() in ("5", "sair"):
+                return False
+            try:
+                game.play_step(idx, carta)
+                return True
+            except ValueError as e:
+                conn.send(f"Erro: {str(e)}\n".encode())
+
+    def play_match(self, fase, team_a, team_b):
+        """
+        Joga um confronto completo em uma mesa e retorna a dupla vencedora.
+        Se a mesa falhar, avança a dupla com mais rodadas vencidas até o erro (Dupla A em caso de empate)
+        e avisa os jogadores das duas duplas. A partida sempre volta ao GAME_POOL.
+        """
+        game = GAME_POOL.checkout(mode=self.mode, singleplayer=False)
+        try:
+            seats = [team_a["jogadores"][0], team_b["jogadores"][0], team_a["jogadores"][1], team_b["jogadores"][1]]
+            game.players = [jogador["conn"] for jogador in seats]
+            game.player_names = [jogador["nome"] for jogador in seats]
+            game.cards_played = {nome: [] for nome in game.player_names}
+            # Mesas só de bots (testes de carga) não entram no ranking, no CSV nem no terminal
+            if not any(jogador["humano"] for jogador in seats):
+                game.persist = False
+                game.verbose = False
+            game.broadcast(f"[TORNEIO] Fase {fase}: {team_a['nome']} x {team_b['nome']}\n")
+            game.start_game()
+            game.deal_cards()
+            game.reveal_hands()
+            game.started = True
+            while not game.finished and any(game.hands):
+                for idx, jogador in enumerate(seats):
+                    if jogador["humano"]:
+                        if not self.human_move(game, idx, jogador["conn"]):
+                            handle_disconnect(game, jogador["nome"])
+                            break
+                    else:
+                        game.play_step(idx, "auto")
+            if not game.finished:
+                game.end_game()
+            return team_a if game.winner_team == 1 else team_b
+        except Exception as e:
+            vencedora = team_a if game.montes[0] >= game.montes[1] else team_b
+            msg = (f"[TORNEIO] Erro na mesa {team_a['nome']} x {team_b['nome']}: {e}. "
+                   f"{vencedora['nome']} avança pelo placar parcial {game.montes}.\n")
+            print(msg, end="")
+            self.notify(team_a, msg)
+            self.notify(team_b, msg)
+            return vencedora
+        finally:
+            GAME_POOL.release(game)
+
+    def run(self):
+        """Executa o chaveamento completo e retorna a dupla campeã."""
+        entrants = [len(self.teams)]
+        while entrants[-1] > 1:
+            entrants.append((entrants[-1] + 1) // 2)
+        bracket = [[None] * n for n in entrants]
+        pending = {}
+        print(f"[TORNEIO] Iniciando torneio com {len(self.teams)} dupla(s) e {len(entrants) - 1} fase(s).")
+
+        with ThreadPoolExecutor(max_workers=self.max_tables) as executor:
+            def advance(fase, slot, team):
+                # 'fase' é o índice da fase em que a dupla entra, 'slot' sua posição nela
+                bracket[fase][slot] = team
+                if fase == len(entrants) - 1:
+                    self.champion = team
+                    return
+                partner = slot ^ 1
+                if partner >= entrants[fase]:
+                    advance(fase + 1, slot // 2, team)  # Bye: a dupla avança sem jogar
+                elif bracket[fase][partner] is not None:
+                    team_a, team_b = bracket[fase][slot & ~1], bracket[fase][slot | 1]
+                    future = executor.submit(self.play_match, fase + 1, team_a, team_b)
+                    pending[future] = (fase, slot // 2, team_a, team_b)
+
+            for slot, team in enumerate(self.teams):
+                advance(0, slot, team)
+            while pending:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    fase, slot, team_a, team_b = pending.pop(future)
+                    vencedora = future.result()
+                    perdedora = team_b if vencedora is team_a else team_a
+                    print(f"[TORNEIO] Fase {fase + 1}: {vencedora['nome']} venceu {perdedora['nome']}.")
+                    self.finish_player(perdedora, f"[TORNEIO] Sua dupla foi eliminada na fase {fase + 1}.\n"
+                                                  + obter_ranking_formatado() + "\n")
+                    if fase + 1 < len(entrants) - 1:
+                        self.notify(vencedora, "[TORNEIO] Sua dupla avançou! Aguarde o próximo confronto.\n")
+                    advance(fase + 1, slot, vencedora)
+
+        print(f"[TORNEIO] Campeã: {self.champion['nome']}")
+        self.finish_player(self.champion, f"[TORNEIO] Parabéns, {self.champion['nome']} é a campeã!\n"
+                                          + obter_ranking_formatado() + "\n")
+        return self.champion
+
+def bot_teams(quantidade):
+    """Cria duplas formadas apenas por bots (útil para testes de carga)."""
+    conn = BotConnection()
+    return [{"nome": f"Dupla {i + 1}",
+             "jogadores": [{"nome": f"D{i + 1}-Bot{j + 1}", "conn": conn, "humano": False} for j in range(2)]}
+            for i in range(quantidade)]
+
+tournament_lobbies = {}  # {modalidade: [jogador, ...]} aguardando o torneio completar
+tournament_lock = threading.Lock()
+
+def join_tournament(client_socket, player_name, modalidade):
+    """
+    Coloca o jogador na fila de torneio da modalidade; duplas são formadas por ordem de chegada.
+    Quando a fila completa TORNEIO_DUPLAS duplas, o torneio começa em uma thread própria.
+    Enquanto está na fila, o jogador pode digitar 5 para sair, e uma desconexão o remove da fila.
+    Depois que o torneio começa, bloqueia até o jogador ser eliminado ou o torneio terminar.
+    """
+    jogador = {"nome": player_name, "conn": client_socket, "humano": True, "liberado": threading.Event()}
+    with tournament_lock:
+        fila = tournament_lobbies.setdefault(modalidade, [])
+        fila.append(jogador)
+        faltam = TORNEIO_DUPLAS * 2 - len(fila)
+        if faltam == 0:
+            teams = [{"nome": f"Dupla {i // 2 + 1} ({fila[i]['nome']} e {fila[i + 1]['nome']})",
+                      "jogadores": [fila[i], fila[i + 1]]} for i in range(0, len(fila), 2)]
+            tournament_lobbies[modalidade] = []
+            threading.Thread(target=Tournament(teams, mode=modalidade).run, daemon=True).start()
+    if faltam > 0:
+        client_socket.send(f"[TORNEIO] Você entrou na fila. Aguardando mais {faltam} jogador(es)... "
+                           f"(digite 5 para sair)\n".encode())
+    while not jogador["liberado"].is_set():
+        try:
+            readable, _, _ = select.select([client_socket], [], [], 1.0)
+        except (OSError, ValueError):
+            readable = [client_socket]
+        if not readable:
+            continue
+        # A leitura é feita com o lock para não disputar a entrada com o torneio, que só começa com o lock
+        with tournament_lock:
+            fila = tournament_lobbies.get(modalidade, [])
+            if jogador not in fila:
+                break  # O torneio começou: a conexão agora é lida pela mesa
+            try:
+                data = client_socket.recv(1024)
+            except OSError:
+                data = b""
+            if not data or data.decode(errors="ignore").strip().lower() in ("5", "sair"):
+                fila.remove(jogador)
+                print(f"[TORNEIO] {player_name} saiu da fila ({len(fila)} na fila).")
+                if data:
+                    client_socket.send(MSG_SAINDO)
+                return
+        client_socket.send("[TORNEIO] Aguardando a fila completar. Digite 5 para sair.\n".encode())
+    jogador["liberado"].wait()
+
 # ------------------------------------------
 # Função para lidar com cada cliente
 # ------------------------------------------
 def handle_client(client_socket):
     game = None
+    room_id = None
     player_name = ""
     try:
-        client_socket.send("Digite seu nome: ".encode())
+        client_socket.send(MSG_NOME)
         player_name = client_socket.recv(1024).decode().strip()
         print(f"[SERVER] Novo jogador conectado: {player_name}")
-        menu_inicial = ("Escolha o modo de jogo:\n"
-                        "1. Jogar contra a máquina (Singleplayer)\n"
-                        "2. Jogar multiplayer\n")
-        client_socket.send(menu_inicial.encode())
+        client_socket.send(MENU_INICIAL)
         try:
             modo = int(client_socket.recv(1024).decode().strip())
         except:
-            client_socket.send("Entrada inválida. Encerrando conexão.\n".encode())
+            client_socket.send(MSG_ENTRADA_INVALIDA)
             return
         singleplayer_choice = True if modo == 1 else False
         
-        client_socket.send("Escolha a modalidade (digite 20 ou 52): ".encode())
+        client_socket.send(MSG_MODALIDADE)
         try:
             modalidade = int(client_socket.recv(1024).decode().strip())
         except:
-            client_socket.send("Entrada inválida. Encerrando conexão.\n".encode())
+            client_socket.send(MSG_ENTRADA_INVALIDA)
             return
         if modalidade not in [20, 52]:
-            client_socket.send("Modalidade inválida. Encerrando conexão.\n".encode())
+            client_socket.send(MSG_MODALIDADE_INVALIDA)
             return
         
+        if modo == 3:
+            join_tournament(client_socket, player_name, modalidade)
+            print(f"[SERVER] Jogador {player_name} saiu do torneio.")
+            return
+
         room_id, game = assign_room(client_socket, player_name, singleplayer_choice, modalidade)
         client_socket.send(f"Você foi atribuído à sala {room_id}.\n".encode())
         print(f"[SERVER] Jogador {player_name} atribuído à sala {room_id}.")
@@ -587,60 +1048,45 @@ def handle_client(client_socket):
         
         # Loop de interação com o cliente
         while True:
-            if game.finished:
-                menu = ("\nA partida acabou!\n"
-                        "6. Jogar novamente (desconecte e reconecte para nova partida)\n"
-                        "7. Mostrar Ranking\n"
-                        "5. Sair\n"
-                        "Digite sua opção: ")
-            else:
-                menu = ("\nEscolha uma opção:\n"
-                        "1. Jogar próxima rodada\n"
-                        "2. Ver histórico\n"
-                        "3. Ver minha mão\n"
-                        "4. Jogar automaticamente\n"
-                        "7. Mostrar Ranking\n"
-                        "5. Sair\n"
-                        "Digite sua opção: ")
-            
+            menu = MENU_FIM if game.finished else MENU_PARTIDA
+
             # Envia o menu somente para o jogador cuja vez é
             if idx == game.current_turn:
-                client_socket.send(menu.encode())
+                client_socket.send(menu)
             else:
                 client_socket.send(f"Agora é a vez de: {game.player_names[game.current_turn]}\n".encode())
                 _ = client_socket.recv(1024).decode().strip()
-                client_socket.send("Aguarde, não é sua vez.\n".encode())
+                client_socket.send(MSG_AGUARDE)
                 continue
 
             opcao_str = client_socket.recv(1024).decode().strip()
             if not opcao_str:
                 break
-            try:
-                opcao = int(opcao_str)
-            except:
-                client_socket.send("Opção inválida!\n".encode())
+            opcao = MENU_OPTIONS.get(opcao_str)
+            if opcao is None:
+                client_socket.send(MSG_OPCAO_INVALIDA)
                 continue
 
             if game.finished:
                 if opcao == 6:
-                    client_socket.send("Para jogar novamente, desconecte e reconecte.\n".encode())
+                    client_socket.send(MSG_JOGAR_NOVAMENTE)
                     break
                 elif opcao == 7:
                     ranking_msg = obter_ranking_formatado()
                     client_socket.send((ranking_msg + "\n").encode())
                     continue
                 elif opcao == 5:
-                    client_socket.send("Saindo...\n".encode())
+                    client_socket.send(MSG_SAINDO)
                     break
                 else:
-                    client_socket.send("Opção inválida!\n".encode())
+                    client_socket.send(MSG_OPCAO_INVALIDA)
                     continue
             else:
                 if opcao == 1:
                     if not game.hands[idx]:
-                        client_socket.send("Você não tem mais cartas para jogar!\n".encode())
+                        client_socket.send(MSG_SEM_CARTAS)
                         continue
-                    client_socket.send("Digite a carta (ex: Kc para Rei de Copas ou 'auto'): ".encode())
+                    client_socket.send(MSG_DIGITE_CARTA)
                     carta = client_socket.recv(1024).decode().strip()
                     try:
                         game.play_step(idx, carta)
@@ -655,7 +1101,7 @@ def handle_client(client_socket):
                     client_socket.send(f"Sua mão: {game.get_hand(idx)}\n".encode())
                 elif opcao == 4:
                     if not game.hands[idx]:
-                        client_socket.send("Você não tem mais cartas para jogar!\n".encode())
+                        client_socket.send(MSG_SEM_CARTAS)
                         continue
                     try:
                         game.play_step(idx, "auto")
@@ -669,17 +1115,17 @@ def handle_client(client_socket):
                     client_socket.send((ranking_msg + "\n").encode())
                 elif opcao == 5:
                     # Se for multiplayer, ao sair, encerra a partida dando vitória à dupla adversária
-                    client_socket.send("Saindo...\n".encode())
+                    client_socket.send(MSG_SAINDO)
                     if not game.singleplayer and not game.finished:
                         handle_disconnect(game, player_name)
                     break
                 else:
-                    client_socket.send("Opção inválida!\n".encode())
+                    client_socket.send(MSG_OPCAO_INVALIDA)
                     continue
 
             with game.lock:
-                if game.hands and all(len(hand) == 0 for hand in game.hands):
-                    game.end_game()
+                if not game.finished and game.hands and all(len(hand) == 0 for hand in game.hands):
+                    game.end_game()  # play_step pode já ter encerrado a partida
         print(f"[SERVER] Cliente {player_name} desconectado.")
     except Exception as e:
         print(f"Erro no handle_client: {str(e)}")
@@ -687,25 +1133,76 @@ def handle_client(client_socket):
         if game is not None and not game.singleplayer and not game.finished:
             handle_disconnect(game, player_name)
     finally:
+        if room_id is not None:
+            leave_room(room_id, client_socket)
         client_socket.close()
 
 # ------------------------------------------
 # Função Principal do Servidor
 # ------------------------------------------
-def server():
+def warm_up():
+    """
+    Pré-aquece o TRICK_CACHE com todas as rodadas de uma e duas cartas do baralho de 20 cartas
+    para cada naipe principal, que são as situações mais avaliadas pelos bots.
+    """
+    game = DouradoGame()
+    for trump_suit in SUITS:
+        game.trump_suit = trump_suit
+        for first in DECK_20:
+            game.resolve_trick({0: first})
+            for second in DECK_20:
+                if second != first:
+                    game.resolve_trick({0: first, 1: second})
+
+def server(warmup=False):
+    # Os sockets sobem primeiro; resolução do IP, pool e aquecimento vêm depois
     server_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    # Permite reiniciar o servidor imediatamente, sem esperar as conexões antigas saírem de TIME_WAIT
+    server_socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
     server_socket.bind(('0.0.0.0', TCP_PORT))
     server_socket.listen(10)
+    mark_startup("bind TCP")
     print("Servidor TCP iniciado na porta", TCP_PORT)
+    threading.Thread(target=udp_discovery, daemon=True).start()
+    threading.Thread(target=resolve_local_ip, daemon=True).start()
+    GAME_POOL.preallocate(POOL_PREALOCADO)
+    mark_startup("pool pré-alocado")
+    if warmup:
+        warm_up()
+        mark_startup("tabelas aquecidas")
+    first_accept = True
     while True:
         try:
             client_socket, addr = server_socket.accept()
+            if first_accept:
+                first_accept = False
+                mark_startup("primeiro accept")
+                if PROFILE_STARTUP:
+                    print(startup_report())
             print(f"[TCP] Conexão estabelecida com {addr}")
             threading.Thread(target=handle_client, args=(client_socket,), daemon=True).start()
         except KeyboardInterrupt:
             print("Servidor encerrado.")
             break
 
+mark_startup("módulo carregado")
+
 if __name__ == "__main__":
-    threading.Thread(target=udp_discovery, daemon=True).start()
-    server()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Servidor do jogo Dourado.")
+    parser.add_argument("--torneio-duplas", type=int, default=TORNEIO_DUPLAS,
+                        help="Duplas necessárias para iniciar um torneio pelo menu")
+    parser.add_argument("--torneio-bots", type=int, metavar="N",
+                        help="Executa um torneio só com N duplas de bots e encerra (teste de carga)")
+    parser.add_argument("--profile-startup", action="store_true",
+                        help="Mostra o tempo de cada etapa da inicialização até o primeiro accept")
+    parser.add_argument("--warmup", action="store_true",
+                        help="Pré-aquece o cache de rodadas depois que os sockets estão escutando")
+    args = parser.parse_args()
+    TORNEIO_DUPLAS = args.torneio_duplas
+    PROFILE_STARTUP = args.profile_startup
+    if args.torneio_bots:
+        inicio = time.perf_counter()
+        Tournament(bot_teams(args.torneio_bots)).run()
+        print(f"[TORNEIO] Torneio concluído em {time.perf_counter() - inicio:.2f}s")
+    else:
+        server(warmup=args.warmup)
\ No newline at end of file